@@ -1,14 +1,66 @@
+import asyncio
 import json
+import logging
 import os
-from web3 import Web3
+import pickle
+import tempfile
+import threading
+import time
+import weakref
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from requests import Session
+from requests.adapters import HTTPAdapter
+from web3 import AsyncWeb3, Web3
+from hexbytes import HexBytes
+from web3.exceptions import TimeExhausted, TransactionNotFound
 from django.conf import settings
+from django.core.cache import cache
+
+from .signing import signer
+
+log = logging.getLogger(__name__)
 
 # ---------------------------------------------------------
 # ✅ Connect to Ganache
 # ---------------------------------------------------------
 GANACHE_RPC = "http://127.0.0.1:7545"
-w3 = Web3(Web3.HTTPProvider(GANACHE_RPC))
-print("✅ Connected to Ganache:", w3.is_connected())
+
+# web3 keeps one requests.Session per *thread*, so a session passed to
+# HTTPProvider(session=...) only serves the importing thread. Hand every
+# thread (request threads, the chain-tx worker) its own keep-alive session
+# with the pooled adapter instead.
+_thread_sessions = threading.local()
+
+
+def rpc_session():
+    session = getattr(_thread_sessions, "session", None)
+    if session is None:
+        session = Session()
+        session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, pool_block=False))
+        _thread_sessions.session = session
+    return session
+
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+
+    def _use_thread_session(self):
+        # no-op once this thread's session is cached by web3
+        self._request_session_manager.cache_and_return_session(self.endpoint_uri, rpc_session())
+
+    def make_request(self, method, params):
+        self._use_thread_session()
+        return super().make_request(method, params)
+
+    def make_batch_request(self, requests):
+        self._use_thread_session()
+        return super().make_batch_request(requests)
+
+
+w3 = Web3(PooledHTTPProvider(
+    GANACHE_RPC,
+    request_kwargs={"timeout": 5},
+))
+log.info("✅ Connected to Ganache: %s", w3.is_connected())
 
 if not w3.is_connected():
     raise Exception("❌ Ganache not connected. Start Ganache GUI.")
@@ -25,25 +77,56 @@ CONTRACT_JSON_PATH = os.path.join(
     "CertificateVerification.json"   # ✅ EXACT FILE NAME FROM TRUFFLE
 )
 
-with open(CONTRACT_JSON_PATH) as f:
-    contract_json = json.load(f)
-
-abi = contract_json["abi"]
+CONTRACT_CACHE_PATH = CONTRACT_JSON_PATH + ".pkl"
 
 
 # ---------------------------------------------------------
-# ✅ Extract deployed contract address from networks
+# ✅ Extract ABI + deployed contract address from networks
 # ---------------------------------------------------------
-def get_contract_address():
+def load_contract_artifact():
+    with open(CONTRACT_JSON_PATH) as f:
+        contract_json = json.load(f)
+
     networks = contract_json.get("networks", {})
     if len(networks) == 0:
         raise Exception("❌ No networks found in Truffle JSON. Did you deploy with Truffle?")
 
-    first_network = list(networks.values())[0]
-    return first_network["address"]
+    first_network = next(iter(networks.values()))
+    return contract_json["abi"], first_network["address"]
+
+
+# Re-use the parsed (abi, address) pair until Truffle rewrites the JSON
+def get_contract_artifact():
+    try:
+        if os.path.getmtime(CONTRACT_CACHE_PATH) >= os.path.getmtime(CONTRACT_JSON_PATH):
+            with open(CONTRACT_CACHE_PATH, "rb") as f:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    artifact = load_contract_artifact()
+
+    # workers boot together → write a temp file and swap it in atomically,
+    # so no worker ever reads a half-written pickle
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(CONTRACT_CACHE_PATH), suffix=".tmp")
+    except OSError:
+        return artifact  # read-only checkout → just parse the JSON every boot
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(artifact, f)
+        os.replace(tmp_path, CONTRACT_CACHE_PATH)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+    return artifact
 
 
-CONTRACT_ADDRESS = get_contract_address()
+abi, CONTRACT_ADDRESS = get_contract_artifact()
 
 
 # ---------------------------------------------------------
@@ -52,24 +135,119 @@ CONTRACT_ADDRESS = get_contract_address()
 contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=abi)
 
 
+# ---------------------------------------------------------
+# ✅ Async path (verification + batch issuance) — pooled aiohttp session
+# ---------------------------------------------------------
+aw3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(
+    GANACHE_RPC,
+    request_kwargs={"timeout": ClientTimeout(total=5)},
+))
+async_contract = aw3.eth.contract(address=CONTRACT_ADDRESS, abi=abi)
+
+# aiohttp sessions are bound to the loop that created them. Under ASGI
+# there is one loop → one pooled session; loops that are thrown away
+# (WSGI async views, asyncio.run in the worker) must call
+# close_async_session() before the loop ends.
+_async_sessions = weakref.WeakKeyDictionary()
+# cache_async_session() awaits, so concurrent first requests on one loop
+# would each build a session; the lock makes the rest wait for the first.
+_async_session_locks = weakref.WeakKeyDictionary()
+
+
+async def ensure_async_session():
+    loop = asyncio.get_running_loop()
+    if loop in _async_sessions:
+        return _async_sessions[loop]
+
+    async with _async_session_locks.setdefault(loop, asyncio.Lock()):
+        if loop not in _async_sessions:
+            session = ClientSession(connector=TCPConnector(limit=32, keepalive_timeout=60))
+            await aw3.provider.cache_async_session(session)
+            _async_sessions[loop] = session
+    return _async_sessions[loop]
+
+
+async def close_async_session():
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+
+# ---------------------------------------------------------
+# ✅ Helper: short-lived gas price cache
+# ---------------------------------------------------------
+GAS_PRICE_TTL = 2.0
+_gas_price_cache = {"v": None, "t": 0.0}
+
+
+def _gas_price_fresh(now):
+    return _gas_price_cache["v"] is not None and now - _gas_price_cache["t"] <= GAS_PRICE_TTL
+
+
+def _store_gas_price(value, now):
+    _gas_price_cache["v"] = value
+    _gas_price_cache["t"] = now
+
+
+def cached_gas_price():
+    now = time.monotonic()
+    if not _gas_price_fresh(now):
+        _store_gas_price(w3.eth.gas_price, now)
+    return _gas_price_cache["v"]
+
+
+# ---------------------------------------------------------
+# ✅ Helper: wait for receipt (exponential backoff)
+# Ganache mines instantly, so start polling fast and back off
+# ---------------------------------------------------------
+def wait_for_receipt(tx_hash, timeout=30, poll_start=0.05, poll_max=1.0):
+    delay = poll_start
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            receipt = w3.eth.get_transaction_receipt(tx_hash)
+            if receipt:
+                return receipt
+        except TransactionNotFound:
+            pass
+
+        if time.monotonic() >= deadline:
+            raise TimeExhausted(f"Transaction {tx_hash.to_0x_hex()} not mined after {timeout} seconds")
+
+        time.sleep(delay)
+        delay = min(delay * 1.5, poll_max)
+
 
 # ---------------------------------------------------------
 # ✅ Helper: Send Raw Transaction
 # ---------------------------------------------------------
-def send_tx(address, private_key, function_call):
-    print("send_tx called!")
-    nonce = w3.eth.get_transaction_count(address)
+def send_tx(address, function_call):
+    log.debug("send_tx called!")
+
+    now = time.monotonic()
+    if _gas_price_fresh(now):
+        nonce = w3.eth.get_transaction_count(address)
+        gas_price = cached_gas_price()
+    else:
+        # cache is stale → refresh it in the same JSON-RPC batch as the nonce
+        with w3.batch_requests() as batch:
+            batch.add(w3.eth.get_transaction_count(address))
+            batch.add(w3.eth.gas_price)
+            nonce, gas_price = batch.execute()
+        _store_gas_price(gas_price, now)
 
     tx = function_call.build_transaction({
         "from": address,
         "nonce": nonce,
         "gas": 3_000_000,
-        "gasPrice": w3.eth.gas_price,
+        "gasPrice": gas_price,
     })
 
-    signed = w3.eth.account.sign_transaction(tx, private_key)
+    signed = signer.sign(tx)
     tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    receipt = wait_for_receipt(tx_hash)
 
     return receipt
 
@@ -77,70 +255,228 @@ def send_tx(address, private_key, function_call):
 # ---------------------------------------------------------
 # ✅ OWNER — authorize issuer (organization)
 # ---------------------------------------------------------
-def authorize_issuer_onchain(owner_address, owner_private_key, org_address):
-    print("authorize_issuer_onchain called!")
+def authorize_issuer_onchain(owner_address, org_address):
+    log.debug("authorize_issuer_onchain called!")
     try:
         receipt = send_tx(
             owner_address,
-            owner_private_key,
             contract.functions.authorizeIssuer(org_address)
         )
-        print("✅ Blockchain authorize_issuer TX receipt:", receipt)
+        log.debug("✅ Blockchain authorize_issuer TX receipt: %s", receipt)
         
-        return receipt.transactionHash.hex()
+        return receipt.transactionHash.to_0x_hex()
     except Exception as e:
-        print("❌ Blockchain authorize_issuer error:", e)
+        log.error("❌ Blockchain authorize_issuer error: %s", e)
         return None
 
 
 # ---------------------------------------------------------
 # ✅ ORGANIZATION — issue certificate
 # ---------------------------------------------------------
-def issue_certificate_onchain(certificate_id, data_hash_bytes32, org_address, org_private_key):
+def issue_certificate_onchain(certificate_id, data_hash_bytes32, org_address):
     try:
         receipt = send_tx(
             org_address,
-            org_private_key,
             contract.functions.issueCertificate(certificate_id, data_hash_bytes32)
         )
+        if receipt.status != 1:
+            log.error("❌ Blockchain issue_certificate reverted (%s)", certificate_id)
+            return None
 
         return {
-            "tx_hash": receipt.transactionHash.hex(),
+            "tx_hash": receipt.transactionHash.to_0x_hex(),
             "block_number": receipt.blockNumber
         }
 
     except Exception as e:
-        print("❌ Blockchain issue_certificate error:", e)
+        log.error("❌ Blockchain issue_certificate error: %s", e)
         return None
 
 
+# ---------------------------------------------------------
+# ✅ ORGANIZATION — issue many certificates concurrently
+# The contract takes one certificate per TX. TXs are sent one by
+# one in nonce order (a failed send must not leave a nonce gap
+# behind later TXs), then all receipts are awaited at once.
+# ---------------------------------------------------------
+async def wait_for_receipt_async(tx_hash, timeout=30, poll_start=0.05, poll_max=1.0):
+    delay = poll_start
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            receipt = await aw3.eth.get_transaction_receipt(tx_hash)
+            if receipt:
+                return receipt
+        except TransactionNotFound:
+            pass
+
+        if time.monotonic() >= deadline:
+            raise TimeExhausted(f"Transaction {tx_hash.to_0x_hex()} not mined after {timeout} seconds")
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, poll_max)
+
+
+async def issue_certificates_onchain_async(certificates, org_address):
+    """
+    certificates = [(certificate_id, data_hash_bytes32), ...]
+    Returns one result (dict or None) per certificate, in order.
+    The signing key for org_address must already be loaded in the
+    signer — it can't hit the ORM from inside the event loop.
+    """
+    await ensure_async_session()
+
+    nonce, gas_price = await asyncio.gather(
+        aw3.eth.get_transaction_count(org_address, "pending"),
+        aw3.eth.gas_price,
+    )
+
+    results = [None] * len(certificates)
+    sent = []  # (index, certificate_id, tx_hash)
+
+    for i, (certificate_id, data_hash) in enumerate(certificates):
+        try:
+            tx = await async_contract.functions.issueCertificate(
+                certificate_id, data_hash
+            ).build_transaction({
+                "from": org_address,
+                "nonce": nonce + i,
+                "gas": 3_000_000,
+                "gasPrice": gas_price,
+            })
+
+            signed = signer.sign(tx)
+            tx_hash = await aw3.eth.send_raw_transaction(signed.raw_transaction)
+
+        except Exception as e:
+            # later nonces would be stuck behind this gap → don't broadcast them
+            log.error(
+                "❌ Blockchain issue_certificate error (%s): %s — %d later certificate(s) not sent",
+                certificate_id, e, len(certificates) - i - 1
+            )
+            break
+
+        sent.append((i, certificate_id, tx_hash))
+
+    receipts = await asyncio.gather(
+        *(wait_for_receipt_async(tx_hash) for _, _, tx_hash in sent),
+        return_exceptions=True
+    )
+
+    for (i, certificate_id, _), receipt in zip(sent, receipts):
+        if isinstance(receipt, Exception):
+            log.error("❌ Blockchain issue_certificate error (%s): %s", certificate_id, receipt)
+        elif receipt.status != 1:
+            log.error("❌ Blockchain issue_certificate reverted (%s)", certificate_id)
+        else:
+            results[i] = {
+                "tx_hash": receipt.transactionHash.to_0x_hex(),
+                "block_number": receipt.blockNumber
+            }
+
+    return results
+
+
 # ---------------------------------------------------------
 # ✅ VERIFY CERTIFICATE ON BLOCKCHAIN
 # ---------------------------------------------------------
-def verify_certificate_onchain(cert_id, data_hash):
-    print("verify_certificate_onchain called!")
-    print("Contract Address:", contract.address)
-    print("Input Hash:", data_hash)
+EMPTY_VERIFY_RESULT = (False, False, 0, "0x0000000000000000000000000000000000000000")
+
+
+def normalize_verify_result(result):
+    # result MAY be 4-tuple or 2-tuple if call failed
+    if len(result) == 4:
+        return result  # (exists, isValid, issuedAt, issuer)
+
+    # If only 2 values were returned, contract call failed internally
+    if len(result) == 2:
+        exists, is_valid = result
+        return (exists, is_valid, 0, EMPTY_VERIFY_RESULT[3])
+
+    # Unexpected fallback
+    return EMPTY_VERIFY_RESULT
+
+
+# Issued certificates only change on-chain when revoked. The cache is
+# per-process (no shared CACHES backend), so a revocation made by another
+# worker or outside this app is only seen once the entry expires — keep
+# the TTL short. revoke_certificate_onchain busts this worker's entry.
+# Not-found results are not cached (the TX may still be pending).
+VERIFY_CACHE_TTL = 60
+
+
+def verify_cache_key(cert_id, data_hash):
+    return f"verify:{cert_id}:{HexBytes(data_hash).to_0x_hex()}"
+
+
+def verify_certificate_onchain(cert_id, data_hash, raise_errors=False):
+    key = verify_cache_key(cert_id, data_hash)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+
+    log.debug("verify_certificate_onchain called! contract=%s hash=%s", contract.address, data_hash)
 
     try:
         result = contract.functions.verifyCertificate(cert_id, data_hash).call()
-        print("✅ Raw blockchain result:", result)
+        log.debug("✅ Raw blockchain result: %s", result)
+
+        result = normalize_verify_result(result)
+        if result[0]:
+            cache.set(key, result, VERIFY_CACHE_TTL)
+        return result
 
-        # result MAY be 4-tuple or 2-tuple if call failed
-        if len(result) == 4:
-            return result  # (exists, isValid, issuedAt, issuer)
+    except Exception as e:
+        log.error("❌ Blockchain verify_certificate error: %s", e)
+        if raise_errors:
+            raise
+
+        # return safe fallback
+        return EMPTY_VERIFY_RESULT
 
-        # If only 2 values were returned, contract call failed internally
-        if len(result) == 2:
-            exists, is_valid = result
-            return (exists, is_valid, 0, "0x0000000000000000000000000000000000000000")
 
-        # Unexpected fallback
-        return (False, False, 0, "0x0000000000000000000000000000000000000000")
+# Unlike the sync helper, RPC errors propagate so callers can tell
+# "node unreachable" apart from "not on chain"
+async def verify_certificate_onchain_async(cert_id, data_hash):
+    key = verify_cache_key(cert_id, data_hash)
+    hit = await cache.aget(key)
+    if hit is not None:
+        return hit
+
+    try:
+        await ensure_async_session()
+        result = await async_contract.functions.verifyCertificate(cert_id, data_hash).call()
+
+        result = normalize_verify_result(result)
+        if result[0]:
+            await cache.aset(key, result, VERIFY_CACHE_TTL)
+        return result
 
     except Exception as e:
-        print("❌ Blockchain verify_certificate error:", e)
+        log.error("❌ Blockchain verify_certificate error: %s", e)
+        raise
 
-        # return safe fallback
-        return (False, False, 0, "0x0000000000000000000000000000000000000000")
 
+# ---------------------------------------------------------
+# ✅ OWNER — revoke certificate
+# ---------------------------------------------------------
+def revoke_certificate_onchain(owner_address, cert_id, data_hash):
+    try:
+        receipt = send_tx(
+            owner_address,
+            contract.functions.revokeCertificate(cert_id)
+        )
+        if receipt.status != 1:
+            log.error("❌ Blockchain revoke_certificate reverted (%s)", cert_id)
+            return None
+
+        return receipt.transactionHash.to_0x_hex()
+
+    except Exception as e:
+        log.error("❌ Blockchain revoke_certificate error: %s", e)
+        return None
+
+    finally:
+        # drop the cached verification either way — state may have changed
+        cache.delete(verify_cache_key(cert_id, data_hash))
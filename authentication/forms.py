@@ -1,3 +1,5 @@
+import csv
+
 from django import forms
 
 class LoginForm(forms.Form):
@@ -16,7 +18,74 @@ class AuthorizeOrgForm(forms.Form):
         "placeholder": "Organization Email"
     }))
 
+class RevokeCertificateForm(forms.Form):
+    certificate_id = forms.CharField(max_length=100, widget=forms.HiddenInput)
+
 class IssueCertificateForm(forms.Form):
     certificate_id = forms.CharField(max_length=100)
     recipient_name = forms.CharField(max_length=200)
     course_name = forms.CharField(max_length=200)
+
+CSV_COLUMNS = ("certificate_id", "recipient_name", "course_name")
+
+# Every row is one signed TX on the single chain-tx worker
+MAX_BATCH_ROWS = 100
+
+
+def parse_certificate_rows(lines):
+    """
+    Validate CSV lines with the same rules as IssueCertificateForm.
+    Returns (rows, skipped): cleaned dicts, and (line number, reason) pairs.
+    A leading header row is ignored.
+    """
+    rows = []
+    skipped = []
+    seen = set()
+
+    for line_no, row in enumerate(csv.reader(lines), start=1):
+        if not any(field.strip() for field in row):
+            continue  # blank line
+
+        if line_no == 1 and tuple(field.strip().lower() for field in row) == CSV_COLUMNS:
+            continue
+
+        if len(row) != len(CSV_COLUMNS):
+            skipped.append((line_no, f"expected {len(CSV_COLUMNS)} columns, got {len(row)}"))
+            continue
+
+        row_form = IssueCertificateForm(dict(zip(CSV_COLUMNS, row)))
+        if not row_form.is_valid():
+            skipped.append((line_no, "invalid " + ", ".join(row_form.errors)))
+            continue
+
+        certificate_id = row_form.cleaned_data["certificate_id"]
+        if certificate_id in seen:
+            skipped.append((line_no, f"duplicate certificate_id {certificate_id}"))
+            continue
+        seen.add(certificate_id)
+
+        rows.append(row_form.cleaned_data)
+
+    return rows, skipped
+
+
+class IssueCertificateBatchForm(forms.Form):
+    csv_file = forms.FileField(
+        label="CSV file (certificate_id, recipient_name, course_name)"
+    )
+
+    def clean_csv_file(self):
+        try:
+            lines = self.cleaned_data["csv_file"].read().decode("utf-8-sig").splitlines()
+        except UnicodeDecodeError:
+            raise forms.ValidationError("CSV file must be UTF-8 encoded.")
+
+        # +1 for an optional header row
+        if sum(1 for line in lines if line.strip()) > MAX_BATCH_ROWS + 1:
+            raise forms.ValidationError(f"CSV file can contain at most {MAX_BATCH_ROWS} certificates.")
+
+        rows, self.skipped_rows = parse_certificate_rows(lines)
+        if not rows:
+            raise forms.ValidationError("No valid rows found in the CSV file.")
+
+        return rows
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from hexbytes import HexBytes
+
+from authentication.blockchain import verify_certificate_onchain
+from authentication.models import Certificate
+from authentication.tasks import issue_certificate_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-issue certificates stuck in PENDING (worker restarted before the "
+        "TX was sent) or FAILED. Certificates already on-chain are reconciled "
+        "instead of being sent again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--failed-only",
+            action="store_true",
+            help="Skip PENDING rows (safe to run while the web server is up).",
+        )
+
+    def handle(self, *args, **options):
+        statuses = [Certificate.STATUS_FAILED]
+        if not options["failed_only"]:
+            statuses.append(Certificate.STATUS_PENDING)
+
+        certs = (
+            Certificate.objects.filter(status__in=statuses)
+            .only("certificate_id", "blockchain_hash", "status")
+            .order_by("pk")
+        )
+
+        for cert in certs:
+            try:
+                exists, is_valid, _, _ = verify_certificate_onchain(
+                    cert.certificate_id,
+                    HexBytes(cert.blockchain_hash),
+                    raise_errors=True
+                )
+            except Exception as e:
+                # never re-send on a guess — an unreachable node looks like "not found"
+                raise CommandError(f"Blockchain unreachable while checking {cert.certificate_id}: {e}")
+
+            if exists:
+                # TX was mined but the row was never updated
+                cert.status = Certificate.STATUS_CONFIRMED if is_valid else Certificate.STATUS_FAILED
+                cert.save(update_fields=["status"])
+                self.stdout.write(f"{cert.certificate_id}: already on-chain → {cert.status}")
+                continue
+
+            issue_certificate_task(cert.pk)
+            cert.refresh_from_db(fields=["status"])
+            self.stdout.write(f"{cert.certificate_id}: re-issued → {cert.status}")
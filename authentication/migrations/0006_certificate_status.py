@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+def set_existing_status(apps, schema_editor):
+    # Before this migration the row was only written after the on-chain call,
+    # so a missing transaction_hash means the issuance failed.
+    Certificate = apps.get_model('authentication', 'Certificate')
+    Certificate.objects.exclude(transaction_hash__isnull=True).update(status='CONFIRMED')
+    Certificate.objects.filter(transaction_hash__isnull=True).update(status='FAILED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_certificate_is_revoked_certificate_revoked_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('CONFIRMED', 'Confirmed'), ('FAILED', 'Failed')], default='PENDING', max_length=20),
+        ),
+        migrations.RunPython(set_existing_status, migrations.RunPython.noop),
+    ]
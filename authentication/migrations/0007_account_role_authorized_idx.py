@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-15 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_certificate_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['role', 'is_authorized'], name='account_role_authorized_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_account_role_authorized_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['issued_by', '-issued_date'], name='cert_issuer_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['-issued_date'], name='cert_issued_date_idx'),
+        ),
+    ]
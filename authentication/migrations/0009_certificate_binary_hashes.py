@@ -0,0 +1,122 @@
+# Generated by Django 5.2.7 on 2026-10-15 12:00
+
+import ast
+import logging
+
+from django.db import migrations, models
+from eth_utils import keccak
+
+log = logging.getLogger(__name__)
+
+
+def hex_to_bytes32(value):
+    """
+    Parse a stored hash into 32 raw bytes. Besides 0x/plain hex this
+    accepts the two legacy formats older code wrote to these columns:
+    a bytes repr ("b'\\xe3...'") and a stringified issue result dict
+    ("{'tx_hash': 'dd34...', 'block_number': 4}").
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+
+    if value[:2] in ("b'", 'b"') or value[:1] == "{":
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return None
+
+        if isinstance(parsed, dict):
+            parsed = parsed.get("tx_hash")
+        if isinstance(parsed, bytes):
+            return parsed if len(parsed) == 32 else None
+        if not isinstance(parsed, str):
+            return None
+
+        value = parsed.strip()
+
+    while value[:2].lower() == "0x":
+        value = value[2:]
+
+    try:
+        raw = bytes.fromhex(value)
+    except ValueError:
+        return None
+
+    return raw if len(raw) == 32 else None
+
+
+def recompute_data_hash(cert):
+    # same formula as views.certificate_data_hash at issuance time
+    raw_data = f"{cert.certificate_id}|{cert.recipient_name}|{cert.course_name}|{cert.issued_by.blockchain_address}"
+    return keccak(text=raw_data)
+
+
+def bytes32_to_hex(value):
+    return "0x" + bytes(value).hex() if value else None
+
+
+def forwards(apps, schema_editor):
+    Certificate = apps.get_model('authentication', 'Certificate')
+    for cert in Certificate.objects.select_related('issued_by'):
+        cert.blockchain_hash_bin = hex_to_bytes32(cert.blockchain_hash)
+        if cert.blockchain_hash_bin is None:
+            cert.blockchain_hash_bin = recompute_data_hash(cert)
+            log.warning("Certificate %s: blockchain_hash %r unparseable, recomputed from certificate data",
+                        cert.certificate_id, cert.blockchain_hash)
+
+        cert.transaction_hash_bin = hex_to_bytes32(cert.transaction_hash)
+        if cert.transaction_hash and cert.transaction_hash_bin is None:
+            log.warning("Certificate %s: transaction_hash %r is not a 32-byte hash, stored as NULL",
+                        cert.certificate_id, cert.transaction_hash)
+
+        cert.save(update_fields=['blockchain_hash_bin', 'transaction_hash_bin'])
+
+
+def backwards(apps, schema_editor):
+    Certificate = apps.get_model('authentication', 'Certificate')
+    for cert in Certificate.objects.all():
+        cert.blockchain_hash = bytes32_to_hex(cert.blockchain_hash_bin) or ""
+        cert.transaction_hash = bytes32_to_hex(cert.transaction_hash_bin)
+        cert.save(update_fields=['blockchain_hash', 'transaction_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_certificate_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='blockchain_hash_bin',
+            field=models.BinaryField(default=b'', max_length=32),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='transaction_hash_bin',
+            field=models.BinaryField(blank=True, max_length=32, null=True),
+        ),
+        migrations.RunPython(forwards, backwards),
+        migrations.RemoveField(
+            model_name='certificate',
+            name='blockchain_hash',
+        ),
+        migrations.RemoveField(
+            model_name='certificate',
+            name='transaction_hash',
+        ),
+        migrations.RenameField(
+            model_name='certificate',
+            old_name='blockchain_hash_bin',
+            new_name='blockchain_hash',
+        ),
+        migrations.RenameField(
+            model_name='certificate',
+            old_name='transaction_hash_bin',
+            new_name='transaction_hash',
+        ),
+    ]
@@ -8,6 +8,10 @@ from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, Permis
 # -------------------------------------------------------
 class AccountManager(BaseUserManager):
 
+    # private_key is only read by the signing service → never load it by default
+    def get_queryset(self):
+        return super().get_queryset().defer("private_key")
+
     def create_user(
         self,
         email,
@@ -88,6 +92,11 @@ class Account(AbstractBaseUser, PermissionsMixin):
 
     objects = AccountManager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["role", "is_authorized"], name="account_role_authorized_idx"),
+        ]
+
     def __str__(self):
         return f"{self.email} [{self.role}]"
 
@@ -100,6 +109,16 @@ class Certificate(models.Model):
     Mirrors on-chain certificate logic (CertificateRecord struct)
     """
 
+    STATUS_PENDING = "PENDING"
+    STATUS_CONFIRMED = "CONFIRMED"
+    STATUS_FAILED = "FAILED"
+
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),        # Saved in DB, waiting for the on-chain receipt
+        (STATUS_CONFIRMED, 'Confirmed'),    # issueCertificate mined
+        (STATUS_FAILED, 'Failed'),          # issueCertificate reverted / node unreachable
+    )
+
     certificate_id = models.CharField(max_length=100, unique=True)
 
     # Real-world metadata (stored in DB, NOT on-chain)
@@ -111,12 +130,39 @@ class Certificate(models.Model):
     issued_by = models.ForeignKey(Account, on_delete=models.CASCADE)
 
     # Blockchain metadata
-    blockchain_hash = models.CharField(max_length=256)        # dataHash
-    transaction_hash = models.CharField(max_length=256, blank=True, null=True)
+    # Raw 32-byte values — use the *_hex properties for display
+    blockchain_hash = models.BinaryField(max_length=32)        # dataHash
+    transaction_hash = models.BinaryField(max_length=32, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
 
     # Retrieved from contract:
     is_revoked = models.BooleanField(default=False)
     revoked_at = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["issued_by", "-issued_date"], name="cert_issuer_date_idx"),
+            models.Index(fields=["-issued_date"], name="cert_issued_date_idx"),
+        ]
+
+    @property
+    def blockchain_hash_hex(self):
+        return "0x" + bytes(self.blockchain_hash).hex()
+
+    @property
+    def transaction_hash_hex(self):
+        if not self.transaction_hash:
+            return ""
+        return "0x" + bytes(self.transaction_hash).hex()
+
+    @property
+    def pdf_cache_key(self):
+        # changes by itself once the TX hash lands → no reliance on a
+        # process-local cache delete
+        return (
+            f"certpdf:{self.certificate_id}:{self.blockchain_hash_hex[:18]}:"
+            f"{self.transaction_hash_hex[:18]}"
+        )
+
     def __str__(self):
         return f"{self.certificate_id} - {self.recipient_name}"
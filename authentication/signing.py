@@ -0,0 +1,51 @@
+# authentication/signing.py
+import os
+
+from eth_account import Account as EthAccount
+
+
+# ---------------------------------------------------------
+# ✅ In-process signing service
+# Keys live in memory, keyed by blockchain address, so the
+# private key never has to travel with request.user.
+#
+# SIGNER_PRIVATE_KEYS = comma-separated hex private keys
+# (addresses are derived from the keys themselves).
+# Accounts without an env key fall back to the DB column once.
+# ---------------------------------------------------------
+class SigningService:
+
+    def __init__(self):
+        self._keys = {}
+
+    def register(self, private_key):
+        address = EthAccount.from_key(private_key).address
+        self._keys[address.lower()] = private_key
+        return address
+
+    def load_from_env(self, var="SIGNER_PRIVATE_KEYS"):
+        for private_key in os.environ.get(var, "").split(","):
+            if private_key.strip():
+                self.register(private_key.strip())
+
+    def private_key_for(self, address):
+        private_key = self._keys.get(address.lower())
+
+        if private_key is None:
+            from .models import Account
+
+            private_key = (
+                Account.objects.only("private_key")
+                .get(blockchain_address=address)
+                .private_key
+            )
+            self._keys[address.lower()] = private_key
+
+        return private_key
+
+    def sign(self, tx):
+        return EthAccount.sign_transaction(tx, self.private_key_for(tx["from"]))
+
+
+signer = SigningService()
+signer.load_from_env()
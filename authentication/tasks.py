@@ -0,0 +1,102 @@
+# authentication/tasks.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+from hexbytes import HexBytes
+
+from .models import Certificate
+from .signing import signer
+from .blockchain import (
+    close_async_session,
+    issue_certificate_onchain,
+    issue_certificates_onchain_async
+)
+
+
+# ---------------------------------------------------------
+# ✅ Background worker for on-chain issuance
+# A single worker keeps transactions from the same org in
+# nonce order, while the request thread returns immediately.
+# ---------------------------------------------------------
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chain-tx")
+
+
+def issue_certificate_task(cert_pk):
+    close_old_connections()
+    try:
+        cert = (
+            Certificate.objects.select_related("issued_by")
+            .only("certificate_id", "blockchain_hash", "issued_by__blockchain_address")
+            .get(pk=cert_pk)
+        )
+
+        result = issue_certificate_onchain(
+            certificate_id=cert.certificate_id,
+            data_hash_bytes32=HexBytes(cert.blockchain_hash),
+            org_address=cert.issued_by.blockchain_address,
+        )
+
+        if result:
+            cert.transaction_hash = bytes(HexBytes(result["tx_hash"]))
+            cert.status = Certificate.STATUS_CONFIRMED
+        else:
+            cert.status = Certificate.STATUS_FAILED
+
+        cert.save(update_fields=["transaction_hash", "status"])
+
+    except Certificate.DoesNotExist:
+        pass
+
+    finally:
+        close_old_connections()
+
+
+def enqueue_issue_certificate(cert_pk):
+    return _executor.submit(issue_certificate_task, cert_pk)
+
+
+def issue_certificates_batch_task(cert_pks):
+    close_old_connections()
+    try:
+        certs = list(
+            Certificate.objects.select_related("issued_by")
+            .only("certificate_id", "blockchain_hash", "issued_by__blockchain_address")
+            .filter(pk__in=cert_pks)
+            .order_by("pk")
+        )
+        if not certs:
+            return
+
+        org_address = certs[0].issued_by.blockchain_address
+
+        # load the key now — a DB fallback inside the event loop would
+        # raise SynchronousOnlyOperation
+        signer.private_key_for(org_address)
+
+        async def run():
+            try:
+                return await issue_certificates_onchain_async(
+                    [(c.certificate_id, HexBytes(c.blockchain_hash)) for c in certs],
+                    org_address=org_address,
+                )
+            finally:
+                await close_async_session()
+
+        results = asyncio.run(run())
+
+        for cert, result in zip(certs, results):
+            if result:
+                cert.transaction_hash = bytes(HexBytes(result["tx_hash"]))
+                cert.status = Certificate.STATUS_CONFIRMED
+            else:
+                cert.status = Certificate.STATUS_FAILED
+
+        Certificate.objects.bulk_update(certs, ["transaction_hash", "status"])
+
+    finally:
+        close_old_connections()
+
+
+def enqueue_issue_certificates_batch(cert_pks):
+    return _executor.submit(issue_certificates_batch_task, cert_pks)
@@ -1,3 +1,465 @@
-from django.test import TestCase
+import asyncio
+import os
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from eth_account import Account as EthAccount
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from hexbytes import HexBytes
+
+from . import blockchain
+from .forms import MAX_BATCH_ROWS, IssueCertificateBatchForm, parse_certificate_rows
+from .models import Account, Certificate
+from .signing import SigningService
+from .tasks import issue_certificate_task
+
+binary_hashes = import_module("authentication.migrations.0009_certificate_binary_hashes")
+
+HASH_HEX = "ab" * 32
+HASH_BYTES = bytes.fromhex(HASH_HEX)
+TX_HASH = HexBytes("0x" + "cd" * 32)
+
+
+def make_receipt(status=1):
+    return mock.Mock(status=status, transactionHash=TX_HASH, blockNumber=7)
+
+
+def make_org(email="org@example.com", address="0x539F4994Bc93378609eC083291C97D900Bc0Df05"):
+    return Account.objects.create_user(
+        email=email,
+        password="pw",
+        blockchain_address=address,
+        private_key="0x" + "11" * 32,
+    )
+
+
+class HexToBytes32Tests(SimpleTestCase):
+
+    def test_prefixed(self):
+        self.assertEqual(binary_hashes.hex_to_bytes32("0x" + HASH_HEX), HASH_BYTES)
+
+    def test_unprefixed(self):
+        self.assertEqual(binary_hashes.hex_to_bytes32(HASH_HEX), HASH_BYTES)
+
+    def test_double_prefixed(self):
+        self.assertEqual(binary_hashes.hex_to_bytes32("0x0x" + HASH_HEX), HASH_BYTES)
+
+    def test_legacy_issue_result_dict(self):
+        value = repr({"tx_hash": HASH_HEX, "block_number": 4})
+        self.assertEqual(binary_hashes.hex_to_bytes32(value), HASH_BYTES)
+
+    def test_legacy_bytes_repr(self):
+        self.assertEqual(binary_hashes.hex_to_bytes32(repr(HASH_BYTES)), HASH_BYTES)
+        self.assertEqual(binary_hashes.hex_to_bytes32(repr(b'\xe3\xea"f' + bytes(28))), b'\xe3\xea"f' + bytes(28))
+
+    def test_invalid_values(self):
+        for value in (None, "", "0x", "not-hex", "0x" + "ab" * 20,
+                      "{'tx_hash': '0x12', 'block_number': 3}", "{'block_number': 3}",
+                      repr(b"short"), "b'unterminated", "{broken"):
+            self.assertIsNone(binary_hashes.hex_to_bytes32(value), value)
+
+    def test_recompute_data_hash_matches_issuance(self):
+        cert = mock.Mock(certificate_id="C-1", recipient_name="Alice", course_name="Math")
+        cert.issued_by.blockchain_address = "0xabc"
+        self.assertEqual(
+            binary_hashes.recompute_data_hash(cert),
+            bytes(Web3.keccak(text="C-1|Alice|Math|0xabc"))
+        )
+
+    def test_round_trip(self):
+        self.assertEqual(binary_hashes.bytes32_to_hex(HASH_BYTES), "0x" + HASH_HEX)
+        self.assertIsNone(binary_hashes.bytes32_to_hex(None))
+
+
+class ParseCertificateRowsTests(SimpleTestCase):
+
+    def test_valid_rows_with_header(self):
+        rows, skipped = parse_certificate_rows([
+            "certificate_id,recipient_name,course_name",
+            "C-1,Alice,Math",
+            "C-2,Bob,Physics",
+        ])
+
+        self.assertEqual([r["certificate_id"] for r in rows], ["C-1", "C-2"])
+        self.assertEqual(rows[0]["recipient_name"], "Alice")
+        self.assertEqual(skipped, [])
+
+    def test_bad_rows_are_reported_with_line_numbers(self):
+        rows, skipped = parse_certificate_rows([
+            "C-1,Alice,Math",
+            "C-2,Bob",
+            "C-3,,Physics",
+            "C-1,Carol,Chemistry",
+            "",
+            "C-4,Dave," + "x" * 201,
+        ])
+
+        self.assertEqual([r["certificate_id"] for r in rows], ["C-1"])
+        self.assertEqual([line_no for line_no, _ in skipped], [2, 3, 4, 6])
+        self.assertIn("expected 3 columns", skipped[0][1])
+        self.assertIn("recipient_name", skipped[1][1])
+        self.assertIn("duplicate", skipped[2][1])
+        self.assertIn("course_name", skipped[3][1])
+
+    def test_header_only_counts_on_first_line(self):
+        rows, skipped = parse_certificate_rows([
+            "C-1,Alice,Math",
+            "certificate_id,recipient_name,course_name",
+        ])
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(skipped, [])
+
+
+class SigningServiceTests(TestCase):
+
+    def setUp(self):
+        self.eth_account = EthAccount.create()
+        self.private_key = self.eth_account.key.to_0x_hex()
+
+    def test_registered_key_is_found_case_insensitively(self):
+        signer = SigningService()
+        address = signer.register(self.private_key)
+
+        self.assertEqual(address, self.eth_account.address)
+        with self.assertNumQueries(0):
+            self.assertEqual(signer.private_key_for(address.lower()), self.private_key)
+            self.assertEqual(signer.private_key_for(address.upper()), self.private_key)
+
+    def test_falls_back_to_db_once(self):
+        Account.objects.create_user(
+            email="org@example.com",
+            password="pw",
+            blockchain_address=self.eth_account.address,
+            private_key=self.private_key,
+        )
+        signer = SigningService()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(signer.private_key_for(self.eth_account.address), self.private_key)
+            self.assertEqual(signer.private_key_for(self.eth_account.address), self.private_key)
+
+    def test_unknown_address_raises(self):
+        with self.assertRaises(Account.DoesNotExist):
+            SigningService().private_key_for(self.eth_account.address)
+
+    def test_load_from_env(self):
+        signer = SigningService()
+        with mock.patch.dict(os.environ, {"TEST_SIGNER_KEYS": f" {self.private_key} ,"}):
+            signer.load_from_env("TEST_SIGNER_KEYS")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(signer.private_key_for(self.eth_account.address), self.private_key)
+
+
+class IssueCertificateTaskTests(TestCase):
+
+    def setUp(self):
+        self.cert = Certificate.objects.create(
+            certificate_id="C-1",
+            recipient_name="Alice",
+            course_name="Math",
+            issued_by=make_org(),
+            blockchain_hash=HASH_BYTES,
+        )
+
+    def run_task(self, **send_tx):
+        with mock.patch("authentication.blockchain.send_tx", **send_tx):
+            issue_certificate_task(self.cert.pk)
+        self.cert.refresh_from_db()
+
+    def test_mined_tx_confirms(self):
+        self.run_task(return_value=make_receipt(status=1))
+
+        self.assertEqual(self.cert.status, Certificate.STATUS_CONFIRMED)
+        self.assertEqual(bytes(self.cert.transaction_hash), bytes(TX_HASH))
+
+    def test_reverted_tx_fails(self):
+        self.run_task(return_value=make_receipt(status=0))
+
+        self.assertEqual(self.cert.status, Certificate.STATUS_FAILED)
+        self.assertIsNone(self.cert.transaction_hash)
+
+    def test_rpc_error_fails(self):
+        self.run_task(side_effect=ConnectionError("node down"))
+
+        self.assertEqual(self.cert.status, Certificate.STATUS_FAILED)
+
+
+class GasPriceCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.dict(blockchain._gas_price_cache, {"v": None, "t": 0.0})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.w3 = mock.Mock()
+        self.gas_price = mock.PropertyMock(return_value=20)
+        type(self.w3.eth).gas_price = self.gas_price
+        patcher = mock.patch.object(blockchain, "w3", self.w3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reuses_value_within_ttl(self):
+        with mock.patch.object(blockchain.time, "monotonic", side_effect=[100.0, 101.0]):
+            self.assertEqual(blockchain.cached_gas_price(), 20)
+            self.assertEqual(blockchain.cached_gas_price(), 20)
+
+        self.assertEqual(self.gas_price.call_count, 1)
+
+    def test_refetches_after_ttl(self):
+        with mock.patch.object(blockchain.time, "monotonic",
+                               side_effect=[100.0, 100.0 + blockchain.GAS_PRICE_TTL + 0.1]):
+            blockchain.cached_gas_price()
+            self.gas_price.return_value = 30
+            self.assertEqual(blockchain.cached_gas_price(), 30)
+
+        self.assertEqual(self.gas_price.call_count, 2)
+
+    def test_send_tx_skips_batch_when_fresh(self):
+        blockchain._store_gas_price(20, blockchain.time.monotonic())
+        self.w3.eth.get_transaction_count.return_value = 3
+        function_call = mock.Mock()
+
+        with mock.patch.object(blockchain, "signer"), \
+                mock.patch.object(blockchain, "wait_for_receipt", return_value=make_receipt()):
+            blockchain.send_tx("0xabc", function_call)
+
+        self.w3.batch_requests.assert_not_called()
+        tx = function_call.build_transaction.call_args.args[0]
+        self.assertEqual((tx["nonce"], tx["gasPrice"]), (3, 20))
+
+
+class VerifyCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        patcher = mock.patch.object(blockchain, "contract")
+        self.contract = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.call = self.contract.functions.verifyCertificate.return_value.call
+
+    def test_found_result_is_cached(self):
+        self.call.return_value = (True, True, 123, "0xabc")
+
+        blockchain.verify_certificate_onchain("C-1", HASH_BYTES)
+        result = blockchain.verify_certificate_onchain("C-1", HASH_BYTES)
+
+        self.assertEqual(tuple(result), (True, True, 123, "0xabc"))
+        self.assertEqual(self.call.call_count, 1)
+
+    def test_not_found_is_not_cached(self):
+        self.call.return_value = (False, False, 0, blockchain.EMPTY_VERIFY_RESULT[3])
+
+        blockchain.verify_certificate_onchain("C-1", HASH_BYTES)
+        blockchain.verify_certificate_onchain("C-1", HASH_BYTES)
+
+        self.assertEqual(self.call.call_count, 2)
+
+    def test_revocation_busts_cache(self):
+        self.call.return_value = (True, True, 123, "0xabc")
+        blockchain.verify_certificate_onchain("C-1", HASH_BYTES)
+
+        with mock.patch.object(blockchain, "send_tx", return_value=make_receipt()):
+            self.assertEqual(blockchain.revoke_certificate_onchain("0xowner", "C-1", HASH_BYTES),
+                             TX_HASH.to_0x_hex())
+
+        self.call.return_value = (True, False, 123, "0xabc")
+        self.assertFalse(blockchain.verify_certificate_onchain("C-1", HASH_BYTES)[1])
+        self.assertEqual(self.call.call_count, 2)
+
+    def test_reverted_revocation_returns_none(self):
+        with mock.patch.object(blockchain, "send_tx", return_value=make_receipt(status=0)):
+            self.assertIsNone(blockchain.revoke_certificate_onchain("0xowner", "C-1", HASH_BYTES))
+
+
+class RevokeCertificateViewTests(TestCase):
+
+    def setUp(self):
+        self.owner = Account.objects.create_user(
+            email="owner@example.com",
+            password="pw",
+            blockchain_address="0x" + "22" * 20,
+            private_key="0x" + "33" * 32,
+            role="OWNER",
+        )
+        self.client.force_login(self.owner)
+
+    def make_cert(self, status):
+        return Certificate.objects.create(
+            certificate_id=f"C-{status}",
+            recipient_name="Alice",
+            course_name="Math",
+            issued_by=make_org(),
+            blockchain_hash=HASH_BYTES,
+            status=status,
+        )
+
+    def revoke(self, cert, **revoke_onchain):
+        with mock.patch("authentication.views.revoke_certificate_onchain", **revoke_onchain) as revoke:
+            self.client.post(reverse("owner_dashboard"), {
+                "action": "revoke",
+                "certificate_id": cert.certificate_id,
+            })
+        cert.refresh_from_db()
+        return revoke
+
+    def test_confirmed_certificate_is_revoked(self):
+        cert = self.make_cert(Certificate.STATUS_CONFIRMED)
+        revoke = self.revoke(cert, return_value=TX_HASH.to_0x_hex())
+
+        revoke.assert_called_once()
+        self.assertTrue(cert.is_revoked)
+        self.assertIsNotNone(cert.revoked_at)
+
+    def test_pending_certificate_is_not_sent_on_chain(self):
+        cert = self.make_cert(Certificate.STATUS_PENDING)
+        revoke = self.revoke(cert)
+
+        revoke.assert_not_called()
+        self.assertFalse(cert.is_revoked)
+
+    def test_failed_chain_tx_keeps_db_flags(self):
+        cert = self.make_cert(Certificate.STATUS_CONFIRMED)
+        self.revoke(cert, return_value=None)
+
+        self.assertFalse(cert.is_revoked)
+
+
+class PdfCacheKeyTests(SimpleTestCase):
+
+    def test_key_changes_once_tx_hash_lands(self):
+        cert = Certificate(certificate_id="C-1", blockchain_hash=HASH_BYTES)
+        pending_key = cert.pdf_cache_key
+
+        cert.transaction_hash = bytes(TX_HASH)
+
+        self.assertNotEqual(cert.pdf_cache_key, pending_key)
+        self.assertIn(TX_HASH.to_0x_hex()[:18], cert.pdf_cache_key)
+
+
+class IssueCertificateBatchFormTests(SimpleTestCase):
+
+    def make_form(self, lines):
+        upload = SimpleUploadedFile("certs.csv", "\n".join(lines).encode("utf-8"))
+        return IssueCertificateBatchForm({}, {"csv_file": upload})
+
+    def test_accepts_max_rows_plus_header(self):
+        form = self.make_form(
+            ["certificate_id,recipient_name,course_name"]
+            + [f"C-{i},Alice,Math" for i in range(MAX_BATCH_ROWS)]
+        )
+
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(len(form.cleaned_data["csv_file"]), MAX_BATCH_ROWS)
+
+    def test_rejects_too_many_rows(self):
+        form = self.make_form([f"C-{i},Alice,Math" for i in range(MAX_BATCH_ROWS + 2)])
+
+        self.assertFalse(form.is_valid())
+        self.assertIn(str(MAX_BATCH_ROWS), form.errors["csv_file"][0])
+
+
+class AsyncSessionTests(SimpleTestCase):
+
+    def test_concurrent_first_calls_share_one_session(self):
+        async def cache_async_session(session):
+            await asyncio.sleep(0)
+            return session
+
+        async def run():
+            try:
+                return await asyncio.gather(*(blockchain.ensure_async_session() for _ in range(5)))
+            finally:
+                await blockchain.close_async_session()
+
+        with mock.patch.object(blockchain.aw3.provider, "cache_async_session", side_effect=cache_async_session) as cache_session:
+            sessions = asyncio.run(run())
+
+        self.assertEqual(cache_session.call_count, 1)
+        self.assertEqual(len({id(s) for s in sessions}), 1)
+
+
+class WaitForReceiptTests(SimpleTestCase):
+
+    def setUp(self):
+        self.w3 = mock.Mock()
+        patcher = mock.patch.object(blockchain, "w3", self.w3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_backs_off_until_mined(self):
+        receipt = make_receipt()
+        self.w3.eth.get_transaction_receipt.side_effect = [TransactionNotFound("pending")] * 4 + [receipt]
+
+        with mock.patch.object(blockchain.time, "monotonic", return_value=0.0), \
+                mock.patch.object(blockchain.time, "sleep") as sleep:
+            self.assertIs(blockchain.wait_for_receipt(TX_HASH, poll_start=0.4, poll_max=1.0), receipt)
+
+        delays = [c.args[0] for c in sleep.call_args_list]
+        self.assertEqual(len(delays), 4)
+        for got, want in zip(delays, [0.4, 0.6, 0.9, 1.0]):
+            self.assertAlmostEqual(got, want)
+
+    def test_raises_after_timeout(self):
+        self.w3.eth.get_transaction_receipt.side_effect = TransactionNotFound("pending")
+
+        with mock.patch.object(blockchain.time, "monotonic", side_effect=[0.0, 1.0, 31.0]), \
+                mock.patch.object(blockchain.time, "sleep") as sleep:
+            with self.assertRaises(TimeExhausted):
+                blockchain.wait_for_receipt(TX_HASH, timeout=30)
+
+        self.assertEqual(sleep.call_count, 1)
+
+
+class VerifyOnchainViewTests(TestCase):
+
+    def setUp(self):
+        Certificate.objects.create(
+            certificate_id="C-1",
+            recipient_name="Alice",
+            course_name="Math",
+            issued_by=make_org(),
+            blockchain_hash=HASH_BYTES,
+            status=Certificate.STATUS_CONFIRMED,
+        )
+        patcher = mock.patch("authentication.views.close_async_session", new_callable=mock.AsyncMock)
+        self.close_session = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, certificate_id, **verify):
+        with mock.patch("authentication.views.verify_certificate_onchain_async",
+                        new_callable=mock.AsyncMock, **verify) as verify_onchain:
+            response = self.client.get(reverse("verify_onchain", args=[certificate_id]))
+        return response, verify_onchain
+
+    def test_found_certificate(self):
+        response, verify_onchain = self.get("C-1", return_value=(True, True, 1700000000, "0xabc"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "exists": True, "is_valid": True, "issued_at": 1700000000, "issuer": "0xabc",
+        })
+        verify_onchain.assert_awaited_once_with("C-1", HexBytes(HASH_BYTES))
+        self.close_session.assert_awaited_once()
+
+    def test_unreachable_chain_returns_503(self):
+        response, _ = self.get("C-1", side_effect=ConnectionError("ganache down"))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"error": "Blockchain unreachable"})
+        self.close_session.assert_awaited_once()
+
+    def test_missing_certificate_returns_404(self):
+        response, verify_onchain = self.get("NOPE")
+
+        self.assertEqual(response.status_code, 404)
+        verify_onchain.assert_not_awaited()
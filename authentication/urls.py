@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import login_user, owner_dashboard, organization_dashboard, verify_certificate, print_certificate_pdf
+from .views import login_user, owner_dashboard, organization_dashboard, issue_batch, verify_certificate, verify_onchain, print_certificate_pdf
 from django.contrib.auth import views as auth_views
 
 
@@ -7,7 +7,9 @@ urlpatterns = [
     path("auth/", login_user, name="login"),
     path("owner/", owner_dashboard, name="owner_dashboard"),
     path("organization/", organization_dashboard, name="organization_dashboard"),
+    path("organization/issue_batch/", issue_batch, name="issue_batch"),
     path("", verify_certificate, name="verify_certificate"),
+    path("verify_onchain/<str:certificate_id>/", verify_onchain, name="verify_onchain"),
     path("print_certificate/<str:certificate_id>/", print_certificate_pdf, name="print_certificate"),
     path('logout/', auth_views.LogoutView.as_view(), name='logout'),
 ]
@@ -1,11 +1,16 @@
 # accounts/views.py
 
+import logging
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from web3 import Web3
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.units import inch
@@ -15,14 +20,28 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from io import BytesIO
 
 from .models import Account, Certificate
-from .forms import LoginForm, AuthorizeOrgForm, IssueCertificateForm
+from .forms import (
+    LoginForm, AuthorizeOrgForm, IssueCertificateForm, IssueCertificateBatchForm, RevokeCertificateForm
+)
+from .tasks import enqueue_issue_certificate, enqueue_issue_certificates_batch
 from hexbytes import HexBytes
 
 # ✅ blockchain.py functions
 from .blockchain import (
     authorize_issuer_onchain,
-    issue_certificate_onchain,
-    verify_certificate_onchain
+    close_async_session,
+    revoke_certificate_onchain,
+    verify_certificate_onchain_async
+)
+
+log = logging.getLogger(__name__)
+
+# Columns the verification page and the PDF actually render —
+# keeps the issuer's private_key out of these queries
+CERTIFICATE_DETAIL_FIELDS = (
+    "certificate_id", "recipient_name", "course_name", "issued_date",
+    "blockchain_hash", "transaction_hash", "status", "is_revoked", "revoked_at",
+    "issued_by__email",
 )
 
 
@@ -65,16 +84,22 @@ def owner_dashboard(request):
     if request.user.role != "OWNER":
         return redirect("organization_dashboard")
 
-    form = AuthorizeOrgForm(request.POST or None)
+    action = request.POST.get("action", "authorize")
+    form = AuthorizeOrgForm((request.POST or None) if action == "authorize" else None)
     message = ""
     blockchain_message = ""
 
-    if request.method == "POST" and form.is_valid():
+    if request.method == "POST" and action == "revoke":
+        message = revoke_certificate(request)
+
+    elif request.method == "POST" and form.is_valid():
         org_email = form.cleaned_data["org_email"]
 
         try:
-            org = Account.objects.get(email=org_email)
-            print("Found org account:", org.email, org.blockchain_address, org.is_authorized, request.user.private_key)
+            org = Account.objects.only(
+                "id", "email", "role", "blockchain_address", "is_authorized"
+            ).get(email=org_email)
+            log.debug("Found org account: %s %s %s", org.email, org.blockchain_address, org.is_authorized)
 
             if org.role != "ORGANIZATION":
                 message = "This account is not an organization."
@@ -85,30 +110,37 @@ def owner_dashboard(request):
                 try:
                     tx_hash = authorize_issuer_onchain(
                     owner_address=request.user.blockchain_address,
-                    owner_private_key=request.user.private_key,
                     org_address=org.blockchain_address
                     )
-                    print("hello")
 
                     # mark as authorized in DB
                     org.is_authorized = True
-                    org.save()
+                    org.save(update_fields=["is_authorized"])
 
                     blockchain_message = f"On-chain Authorization Success. TX: {tx_hash}"
                     message = f"{org_email} is now an authorized issuer."
 
                 except Exception as e:
                     blockchain_message = f"Blockchain error: {str(e)}"
-                    print("error")
+                    log.error("Blockchain authorize error for %s: %s", org_email, e)
 
         except Account.DoesNotExist:
             message = "Organization account does not exist."
 
     # lists for UI
-    authorized_orgs = Account.objects.filter(role="ORGANIZATION", is_authorized=True)
-    pending_orgs = Account.objects.filter(role="ORGANIZATION", is_authorized=False)
-
-    certificates = Certificate.objects.all().order_by("-issued_date")
+    orgs = list(
+        Account.objects.filter(role="ORGANIZATION")
+        .only("email", "blockchain_address", "is_authorized")
+    )
+    authorized_orgs = [o for o in orgs if o.is_authorized]
+    pending_orgs = [o for o in orgs if not o.is_authorized]
+
+    certificates = (
+        Certificate.objects.select_related("issued_by")
+        .only("certificate_id", "recipient_name", "course_name", "issued_date",
+              "status", "is_revoked", "issued_by__email")
+        .order_by("-issued_date")
+    )
 
     return render(request, "authentication/owner_dashboard.html", {
         "form": form,
@@ -121,6 +153,59 @@ def owner_dashboard(request):
 
 
 
+# ------------------------------------------------------------
+# ✅ OWNER — revoke a certificate (chain TX → DB flags → cache)
+# ------------------------------------------------------------
+def revoke_certificate(request):
+    form = RevokeCertificateForm(request.POST)
+    if not form.is_valid():
+        return "Invalid revocation request."
+
+    certificate_id = form.cleaned_data["certificate_id"]
+
+    try:
+        cert = Certificate.objects.only(
+            "certificate_id", "blockchain_hash", "status", "is_revoked", "revoked_at"
+        ).get(certificate_id=certificate_id)
+    except Certificate.DoesNotExist:
+        return "Certificate does not exist."
+
+    if cert.is_revoked:
+        return f"Certificate {certificate_id} is already revoked."
+
+    # PENDING / FAILED rows aren't on-chain → the TX would only revert
+    if cert.status != Certificate.STATUS_CONFIRMED:
+        return f"Certificate {certificate_id} is not on-chain yet and cannot be revoked."
+
+    tx_hash = revoke_certificate_onchain(
+        owner_address=request.user.blockchain_address,
+        cert_id=cert.certificate_id,
+        data_hash=HexBytes(cert.blockchain_hash)
+    )
+    if tx_hash is None:
+        return f"Blockchain error: could not revoke {certificate_id}."
+
+    cert.is_revoked = True
+    cert.revoked_at = timezone.now()
+    cert.save(update_fields=["is_revoked", "revoked_at"])
+
+    return f"Certificate {certificate_id} revoked. TX: {tx_hash}"
+
+
+
+# ------------------------------------------------------------
+# ✅ create the certificate metadata hash
+# this matches your smart contract's logic: send only dataHash
+# ------------------------------------------------------------
+def certificate_data_hash(certificate_id, recipient, course, org_address):
+    raw_data = f"{certificate_id}|{recipient}|{course}|{org_address}"
+
+    # bytes32 keccak hash
+    # (same digest as solidity_keccak(['string'], ...) — packed string = utf-8 bytes)
+    return Web3.keccak(text=raw_data)
+
+
+
 # ------------------------------------------------------------
 # ✅ ORGANIZATION DASHBOARD
 # Must be authorized to issue certificates
@@ -147,52 +232,42 @@ def organization_dashboard(request):
         recipient = form.cleaned_data["recipient_name"]
         course = form.cleaned_data["course_name"]
 
-        # ------------------------------------------------------------
-        # ✅ create the certificate metadata hash (SHA256)
-        # this matches your smart contract's logic: send only dataHash
-        # ------------------------------------------------------------
-        raw_data = f"{certificate_id}|{recipient}|{course}|{request.user.blockchain_address}"
-
-        # ✅ Step 1: compute bytes32 keccak hash
-        hash_bytes = Web3.solidity_keccak(['string'], [raw_data])
-
-        # ✅ Step 2: convert to HexBytes (strict bytes32 type)
-        data_hash_bytes32 = HexBytes(hash_bytes)
+        hash_bytes = certificate_data_hash(certificate_id, recipient, course, request.user.blockchain_address)
 
         # ------------------------------------------------------------
-        # ✅ BLOCKCHAIN: Issue certificate on-chain
+        # ✅ Save metadata in database, then issue on-chain in the
+        # background — the row flips to CONFIRMED once mined
         # ------------------------------------------------------------
         try:
-            tx_hash = issue_certificate_onchain(
-                org_address=request.user.blockchain_address,
-                org_private_key=request.user.private_key,
-                certificate_id=certificate_id,
-                data_hash_bytes32=data_hash_bytes32
-            )
-
-            # ------------------------------------------------------------
-            # ✅ Save metadata in database
-            # ------------------------------------------------------------
-            Certificate.objects.create(
+            cert = Certificate.objects.create(
                 certificate_id=certificate_id,
                 recipient_name=recipient,
                 course_name=course,
                 issued_by=request.user,
-                blockchain_hash="0x" + hash_bytes.hex(),
-                transaction_hash=tx_hash
+                blockchain_hash=hash_bytes,
+                transaction_hash=None,
+                status=Certificate.STATUS_PENDING
             )
 
-            message = "Certificate issued successfully!"
-            blockchain_message = f"Blockchain TX: {tx_hash}"
+            transaction.on_commit(lambda: enqueue_issue_certificate(cert.pk))
 
-        except Exception as e:
-            blockchain_message = f"Blockchain error: {str(e)}"
+            message = "Certificate saved — blockchain issuance is pending."
+            blockchain_message = "Waiting for on-chain confirmation."
 
+        except IntegrityError:
+            blockchain_message = f"Certificate ID {certificate_id} already exists."
 
-    issued_certificates = Certificate.objects.filter(issued_by=request.user).order_by("-issued_date")
+
+    issued_certificates = (
+        Certificate.objects.filter(issued_by=request.user)
+        .only("certificate_id", "recipient_name", "course_name", "issued_date",
+              "blockchain_hash", "transaction_hash", "status")
+        .order_by("-issued_date")
+    )
 
     return render(request, "authentication/organization_dashboard.html", {
         "form": form,
+        "batch_form": IssueCertificateBatchForm(),
         "message": message,
         "blockchain_message": blockchain_message,
         "issued_certificates": issued_certificates,
@@ -201,6 +276,74 @@ def organization_dashboard(request):
 
 
 
+# ------------------------------------------------------------
+# ✅ ORGANIZATION — BATCH ISSUE (CSV upload)
+# One INSERT for the whole file, then all on-chain TXs in parallel
+# ------------------------------------------------------------
+@login_required
+def issue_batch(request):
+
+    if request.user.role != "ORGANIZATION" or not request.user.is_authorized:
+        return redirect("organization_dashboard")
+
+    form = IssueCertificateBatchForm(request.POST or None, request.FILES or None)
+
+    if request.method != "POST":
+        return redirect("organization_dashboard")
+
+    if not form.is_valid():
+        for error in form.errors.get("csv_file", ["Please choose a CSV file."]):
+            messages.error(request, f"CSV upload: {error}")
+        return redirect("organization_dashboard")
+
+    skipped = getattr(form, "skipped_rows", [])
+    if skipped:
+        messages.warning(request, f"Skipped {len(skipped)} row(s): " + "; ".join(
+            f"line {line_no} ({reason})" for line_no, reason in skipped
+        ))
+
+    certs = []
+    seen = set()
+
+    for row in form.cleaned_data["csv_file"]:
+        certificate_id = row["certificate_id"]
+        seen.add(certificate_id)
+
+        hash_bytes = certificate_data_hash(
+            certificate_id, row["recipient_name"], row["course_name"], request.user.blockchain_address
+        )
+        certs.append(Certificate(
+            certificate_id=certificate_id,
+            recipient_name=row["recipient_name"],
+            course_name=row["course_name"],
+            issued_by=request.user,
+            blockchain_hash=hash_bytes,
+            transaction_hash=None,
+            status=Certificate.STATUS_PENDING
+        ))
+
+    existing = set(
+        Certificate.objects.filter(certificate_id__in=seen)
+        .values_list("certificate_id", flat=True)
+    )
+    if existing:
+        messages.error(request, f"Certificate IDs already exist: {', '.join(sorted(existing))}")
+        return redirect("organization_dashboard")
+
+    try:
+        with transaction.atomic():
+            created = Certificate.objects.bulk_create(certs)
+            cert_pks = [cert.pk for cert in created]
+            transaction.on_commit(lambda: enqueue_issue_certificates_batch(cert_pks))
+    except IntegrityError:
+        messages.error(request, "Some certificate IDs already exist.")
+        return redirect("organization_dashboard")
+
+    messages.success(request, f"{len(certs)} certificates saved — blockchain issuance is pending.")
+    return redirect("organization_dashboard")
+
+
+
 # ------------------------------------------------------------
 # ✅ CERTIFICATE VERIFICATION VIEW
 # Anyone can verify by entering certificate ID + metadata
@@ -210,7 +353,7 @@ from .models import Certificate
 from web3 import Web3
 
 
-def verify_certificate(request):
+async def verify_certificate(request):
 
     context = {}
 
@@ -219,8 +362,10 @@ def verify_certificate(request):
 
         # ✅ Fetch from DB
         try:
-            cert = Certificate.objects.select_related("issued_by").get(
-                certificate_id=certificate_id
+            cert = await (
+                Certificate.objects.select_related("issued_by")
+                .only(*CERTIFICATE_DETAIL_FIELDS)
+                .aget(certificate_id=certificate_id)
             )
 
             # ✅ Certificate found → show its details
@@ -235,14 +380,146 @@ def verify_certificate(request):
 
     return render(request, "authentication/verify_certificate.html", context)
 
-def print_certificate_pdf(request, certificate_id):
+
+# ------------------------------------------------------------
+# ✅ ON-CHAIN PROOF (JSON)
+# Fetched lazily from the verification page, so the page itself
+# never waits on a blockchain RPC (results are cached in blockchain.py)
+# ------------------------------------------------------------
+async def verify_onchain(request, certificate_id):
     try:
-        cert = Certificate.objects.select_related("issued_by").get(
+        cert = await Certificate.objects.only("certificate_id", "blockchain_hash").aget(
             certificate_id=certificate_id
         )
+    except Certificate.DoesNotExist:
+        return JsonResponse({"error": "Certificate not found"}, status=404)
+
+    try:
+        exists, is_valid, issued_at, issuer = await verify_certificate_onchain_async(
+            cert.certificate_id,
+            HexBytes(cert.blockchain_hash)
+        )
+    except Exception:
+        return JsonResponse({"error": "Blockchain unreachable"}, status=503)
+    finally:
+        # Under WSGI every async view runs on a throwaway event loop, so its
+        # aiohttp session can't be reused — close it with the request.
+        # Under ASGI the app's single loop keeps one pooled session.
+        if "wsgi.version" in request.META:
+            await close_async_session()
+
+    payload = {
+        "exists": exists,
+        "is_valid": is_valid,
+        "issued_at": issued_at,
+        "issuer": issuer,
+    }
+
+    return JsonResponse(payload)
+
+# ------------------------------------------------------------
+# ✅ PDF STYLES
+# Built once per process — they carry no per-certificate data
+# ------------------------------------------------------------
+_STYLES = getSampleStyleSheet()
+
+PDF_CACHE_TTL = 60 * 60 * 24
+
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1a5490'),
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#2c5282'),
+    spaceAfter=20,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+_RECIPIENT_STYLE = ParagraphStyle(
+    'Recipient',
+    parent=_STYLES['Normal'],
+    fontSize=14,
+    alignment=TA_CENTER,
+    spaceAfter=12
+)
+
+_NAME_STYLE = ParagraphStyle(
+    'Name',
+    parent=_STYLES['Normal'],
+    fontSize=20,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold',
+    textColor=colors.HexColor('#1a5490'),
+    spaceAfter=12
+)
+
+_COURSE_STYLE = ParagraphStyle(
+    'Course',
+    parent=_STYLES['Normal'],
+    fontSize=18,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold',
+    spaceAfter=12
+)
+
+_VERIFICATION_STYLE = ParagraphStyle(
+    'Verification',
+    parent=_STYLES['Normal'],
+    fontSize=9,
+    textColor=colors.grey,
+    alignment=TA_LEFT
+)
+
+_DETAILS_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('TOPPADDING', (0, 0), (-1, -1), 12),
+])
+
+
+def print_certificate_pdf(request, certificate_id):
+    try:
+        cert = (
+            Certificate.objects.select_related("issued_by")
+            .only(*CERTIFICATE_DETAIL_FIELDS)
+            .get(certificate_id=certificate_id)
+        )
     except Certificate.DoesNotExist:
         return HttpResponse("Certificate not found", status=404)
 
+    # ✅ Same certificate → same bytes, skip ReportLab on repeats
+    # (only once confirmed — a pending PDF would go stale)
+    if cert.status == Certificate.STATUS_CONFIRMED:
+        pdf = cache.get(cert.pdf_cache_key)
+        if pdf is None:
+            pdf = render_certificate_pdf(cert)
+            cache.set(cert.pdf_cache_key, pdf, PDF_CACHE_TTL)
+    else:
+        pdf = render_certificate_pdf(cert)
+
+    # BytesIO over immutable bytes shares the buffer → no extra copy
+    return FileResponse(
+        BytesIO(pdf),
+        as_attachment=True,
+        filename=f"certificate_{cert.certificate_id}.pdf",
+        content_type="application/pdf"
+    )
+
+
+def render_certificate_pdf(cert):
     # Create the PDF in memory
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
@@ -250,74 +527,27 @@ def print_certificate_pdf(request, certificate_id):
     # Container for the 'Flowable' objects
     elements = []
     
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a5490'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#2c5282'),
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
     # Title
-    title = Paragraph("CERTIFICATE OF COMPLETION", title_style)
+    title = Paragraph("CERTIFICATE OF COMPLETION", _TITLE_STYLE)
     elements.append(title)
     elements.append(Spacer(1, 0.3*inch))
     
     # Certificate ID (centered)
-    cert_id_text = Paragraph(f"<b>Certificate ID:</b> {cert.certificate_id}", heading_style)
+    cert_id_text = Paragraph(f"<b>Certificate ID:</b> {cert.certificate_id}", _HEADING_STYLE)
     elements.append(cert_id_text)
     elements.append(Spacer(1, 0.5*inch))
     
     # Main certificate text
-    recipient_style = ParagraphStyle(
-        'Recipient',
-        parent=styles['Normal'],
-        fontSize=14,
-        alignment=TA_CENTER,
-        spaceAfter=12
-    )
-    
-    elements.append(Paragraph("This is to certify that", recipient_style))
+    elements.append(Paragraph("This is to certify that", _RECIPIENT_STYLE))
     elements.append(Spacer(1, 0.2*inch))
     
-    name_style = ParagraphStyle(
-        'Name',
-        parent=styles['Normal'],
-        fontSize=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold',
-        textColor=colors.HexColor('#1a5490'),
-        spaceAfter=12
-    )
-    elements.append(Paragraph(cert.recipient_name, name_style))
+    elements.append(Paragraph(cert.recipient_name, _NAME_STYLE))
     elements.append(Spacer(1, 0.2*inch))
     
-    elements.append(Paragraph("has successfully completed", recipient_style))
+    elements.append(Paragraph("has successfully completed", _RECIPIENT_STYLE))
     elements.append(Spacer(1, 0.2*inch))
     
-    course_style = ParagraphStyle(
-        'Course',
-        parent=styles['Normal'],
-        fontSize=18,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold',
-        spaceAfter=12
-    )
-    elements.append(Paragraph(cert.course_name, course_style))
+    elements.append(Paragraph(cert.course_name, _COURSE_STYLE))
     elements.append(Spacer(1, 0.5*inch))
     
     # Details table
@@ -327,45 +557,26 @@ def print_certificate_pdf(request, certificate_id):
     ]
     
     table = Table(data, colWidths=[2*inch, 4*inch])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 12),
-    ]))
+    table.setStyle(_DETAILS_TABLE_STYLE)
     
     elements.append(table)
     elements.append(Spacer(1, 0.5*inch))
     
     # Blockchain verification info
-    verification_style = ParagraphStyle(
-        'Verification',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.grey,
-        alignment=TA_LEFT
-    )
-    
-    elements.append(Paragraph("<b>Blockchain Verification:</b>", verification_style))
+    elements.append(Paragraph("<b>Blockchain Verification:</b>", _VERIFICATION_STYLE))
     elements.append(Spacer(1, 0.1*inch))
     
-    hash_text = f"<b>Hash:</b> {cert.blockchain_hash[:64]}..."
-    elements.append(Paragraph(hash_text, verification_style))
+    hash_text = f"<b>Hash:</b> {cert.blockchain_hash_hex[:64]}..."
+    elements.append(Paragraph(hash_text, _VERIFICATION_STYLE))
     
-    tx_text = f"<b>Transaction:</b> {cert.transaction_hash[:64]}..."
-    elements.append(Paragraph(tx_text, verification_style))
+    tx_text = f"<b>Transaction:</b> {(cert.transaction_hash_hex or 'pending')[:64]}..."
+    elements.append(Paragraph(tx_text, _VERIFICATION_STYLE))
     
     # Build PDF
     doc.build(elements)
     
-    # Get the value of the BytesIO buffer and write it to the response
+    # Get the value of the BytesIO buffer
     pdf = buffer.getvalue()
     buffer.close()
-    
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="certificate_{cert.certificate_id}.pdf"'
-    response.write(pdf)
-    
-    return response
\ No newline at end of file
+
+    return pdf